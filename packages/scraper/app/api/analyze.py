@@ -2,7 +2,6 @@
 
 import os
 import asyncio
-import httpx
 from fastapi import APIRouter
 from pydantic import BaseModel
 from typing import Optional
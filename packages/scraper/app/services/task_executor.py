@@ -353,11 +353,15 @@ class TaskExecutor:
 
         return True
 
-    async def execute(self, task_id: str, execution_id: str = None,
+    async def execute(self, task_id: uuid.UUID | str, execution_id: str = None,
                       is_dry_run: bool = False,
                       stealth_enabled: bool = True, user_agent: str = None,
                       action_delay_ms: int = 0) -> dict:
-        """Execute a complete task flow."""
+        """Execute a complete task flow.
+
+        ``task_id`` may be a UUID or its string form; it is bound to the query
+        as-is, so callers that already hold a UUID need not format it.
+        """
 
         task = self.db.query(Task).filter(Task.id == task_id).first()
         if not task:
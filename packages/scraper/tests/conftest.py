@@ -1,10 +1,50 @@
 """Shared fixtures for FormBot scraper tests."""
 
+import asyncio
+import itertools
 import uuid
 from datetime import UTC, datetime
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+import pytest_asyncio
+
+try:
+    import uvloop
+except ImportError:  # uvloop ships with uvicorn[standard], but not on every platform
+    uvloop = None
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_asyncio_loop_factories(config, item):
+    """Run async tests on uvloop when it is installed.
+
+    pytest-asyncio parametrizes a session-scoped loop fixture over the
+    factories returned here, and pytest regroups tests by that parameter, so
+    tests no longer run in file order. For example, the sync tests in
+    test_editing_api.py run after the async modules. Tests must therefore
+    not rely on state left behind by earlier tests.
+    """
+    if uvloop is None:
+        return None
+    return {"uvloop": uvloop.new_event_loop}
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def _no_leaked_tasks():
+    """Fail a test that leaves tasks running on the shared session event loop.
+
+    The leaked tasks are cancelled before the assertion, so later tests
+    sharing the loop do not inherit them.
+    """
+    yield
+    current = asyncio.current_task()
+    leaked = [task for task in asyncio.all_tasks() if task is not current and not task.done()]
+    for task in leaked:
+        task.cancel()
+    await asyncio.gather(*leaked, return_exceptions=True)
+    assert not leaked, f"test left tasks running on the shared loop: {leaked}"
 
 
 # ---------------------------------------------------------------------------
@@ -52,46 +92,47 @@ NO_FORMS_HTML = """
 # Mock Playwright helpers
 # ---------------------------------------------------------------------------
 
-def _make_mock_page(html_content: str = SIMPLE_LOGIN_HTML, has_password: bool = False) -> AsyncMock:
-    """Return an AsyncMock that behaves like a Playwright Page.
+class _LazyPage:
+    """Stand-in for a Playwright Page whose coroutine methods are built lazily.
+
+    Attributes that need a specific shape (``url``, ``content``, ``locator`` ...)
+    are set up front. Any other method (``goto``, ``fill``, ``select_option`` ...)
+    becomes a fresh ``_AsyncReturn`` stub on first access and is cached on the
+    instance, so a test only pays for the page methods the code under test
+    touches. Untouched methods report an empty ``calls`` list.
+    """
+
+    def __init__(self, html_content: str, has_password: bool):
+        self.url = "https://example.com/login"
+        self.main_frame = object()  # only compared by identity
+        self.content = _AsyncReturn(html_content)
+        self.evaluate = _AsyncReturn("")
+        self.query_selector = _AsyncReturn(object())  # non-None element
+        self.keyboard = SimpleNamespace(press=_AsyncReturn())
+
+        # Mock locator().count() for _detect_login_heuristic
+        locator_mock = AsyncMock()
+        locator_mock.count = AsyncMock(return_value=1 if has_password else 0)
+        self.locator = MagicMock(return_value=locator_mock)
+
+    def __getattr__(self, name: str) -> "_AsyncReturn":
+        if name.startswith("__"):
+            raise AttributeError(name)
+        method = _AsyncReturn()
+        setattr(self, name, method)
+        return method
+
+
+def _make_mock_page(html_content: str = SIMPLE_LOGIN_HTML, has_password: bool = False) -> _LazyPage:
+    """Return an object that behaves like a Playwright Page.
 
     If *has_password* is True, ``page.locator(selector).count()`` returns 1 for
     password-related selectors so that ``_detect_login_heuristic`` sees a login page.
     """
-    page = AsyncMock()
-    page.url = "https://example.com/login"
-    page.main_frame = MagicMock()
-    page.goto = AsyncMock()
-    page.wait_for_timeout = AsyncMock()
-    page.wait_for_load_state = AsyncMock()
-    page.wait_for_function = AsyncMock()
-    page.wait_for_url = AsyncMock()
-    page.wait_for_event = AsyncMock()
-    page.content = AsyncMock(return_value=html_content)
-    page.evaluate = AsyncMock(return_value="")
-    page.screenshot = AsyncMock()
-    page.fill = AsyncMock()
-    page.click = AsyncMock()
-    page.check = AsyncMock()
-    page.uncheck = AsyncMock()
-    page.select_option = AsyncMock()
-    page.set_input_files = AsyncMock()
-    page.eval_on_selector = AsyncMock()
-    page.wait_for_selector = AsyncMock()
-    page.query_selector = AsyncMock(return_value=MagicMock())  # non-None element
-    page.add_init_script = AsyncMock()
-    page.keyboard = MagicMock()
-    page.keyboard.press = AsyncMock()
-
-    # Mock locator().count() for _detect_login_heuristic
-    locator_mock = AsyncMock()
-    locator_mock.count = AsyncMock(return_value=1 if has_password else 0)
-    page.locator = MagicMock(return_value=locator_mock)
-
-    return page
-
-
-def _make_mock_context(page: AsyncMock) -> AsyncMock:
+    return _LazyPage(html_content, has_password)
+
+
+def _make_mock_context(page: _LazyPage) -> AsyncMock:
     """Return an AsyncMock that behaves like a Playwright BrowserContext."""
     context = AsyncMock()
     context.new_page = AsyncMock(return_value=page)
@@ -153,14 +194,48 @@ def mock_playwright(mock_browser):
 # Mock database session
 # ---------------------------------------------------------------------------
 
+class _CallCounter:
+    """Callable that only counts how many times it was invoked.
+
+    Much cheaper per call than ``MagicMock.__call__`` for session methods whose
+    arguments the tests never inspect; exposes ``call_count`` like a mock.
+    """
+
+    __slots__ = ("call_count",)
+
+    def __init__(self):
+        self.call_count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.call_count += 1
+
+
+class _AsyncReturn:
+    """Awaitable stub that records its calls and returns a fixed value.
+
+    A lightweight replacement for ``AsyncMock(return_value=...)`` when a test
+    only needs the return value and the list of recorded ``calls``.
+    """
+
+    __slots__ = ("value", "calls")
+
+    def __init__(self, value=None):
+        self.value = value
+        self.calls = []
+
+    async def __call__(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        return self.value
+
+
 @pytest.fixture
 def mock_db():
     """Return a MagicMock that behaves like a SQLAlchemy Session."""
     db = MagicMock()
-    db.add = MagicMock()
-    db.commit = MagicMock()
-    db.refresh = MagicMock()
-    db.close = MagicMock()
+    db.add = _CallCounter()
+    db.commit = _CallCounter()
+    db.refresh = _CallCounter()
+    db.close = _CallCounter()
     # query().filter().first() and query().filter().order_by().all()
     # are set up per-test because return values vary.
     return db
@@ -170,102 +245,112 @@ def mock_db():
 # Model factory helpers
 # ---------------------------------------------------------------------------
 
-def make_task(**overrides):
-    """Create a Task-like MagicMock with sensible defaults."""
-    defaults = {
-        "id": uuid.uuid4(),
-        "user_id": 1,
-        "name": "Test Task",
-        "target_url": "https://example.com/login",
-        "schedule_type": "once",
-        "schedule_cron": None,
-        "schedule_at": None,
-        "status": "draft",
-        "is_dry_run": False,
-        "max_retries": 3,
-        "max_parallel": 1,
-        "stealth_enabled": True,
-        "custom_user_agent": None,
-        "action_delay_ms": 500,
-        "cloned_from": None,
-        "created_at": datetime.now(UTC),
-        "updated_at": datetime.now(UTC),
-    }
-    defaults.update(overrides)
-    obj = MagicMock()
-    for k, v in defaults.items():
-        setattr(obj, k, v)
+# Ids come from a counter rather than uuid4(), which reads os.urandom on every
+# call; they only need to be unique within a run, and stay reproducible.
+_uuid_counter = itertools.count(1)
+
+
+def _next_uuid() -> uuid.UUID:
+    return uuid.UUID(int=next(_uuid_counter))
+
+
+@pytest.fixture
+def fake_uuid():
+    """Return a factory handing out deterministic, run-unique UUIDs."""
+    return _next_uuid
+
+
+# Defaults are built once at import; each factory call only copies them into
+# a SimpleNamespace and generates the ids the caller did not pass.
+_TIMESTAMP = datetime.now(UTC)
+
+_TASK_DEFAULTS = {
+    "user_id": 1,
+    "name": "Test Task",
+    "target_url": "https://example.com/login",
+    "schedule_type": "once",
+    "schedule_cron": None,
+    "schedule_at": None,
+    "status": "draft",
+    "is_dry_run": False,
+    "max_retries": 3,
+    "max_parallel": 1,
+    "stealth_enabled": True,
+    "custom_user_agent": None,
+    "action_delay_ms": 500,
+    "cloned_from": None,
+    "created_at": _TIMESTAMP,
+    "updated_at": _TIMESTAMP,
+}
+
+_FORM_DEFINITION_DEFAULTS = {
+    "step_order": 1,
+    "depends_on_step_order": None,
+    "page_url": "https://example.com/login",
+    "form_type": "login",
+    "form_selector": "#login-form",
+    "submit_selector": "#submit-btn",
+    "human_breakpoint": False,
+    "created_at": _TIMESTAMP,
+    "updated_at": _TIMESTAMP,
+}
+
+_FORM_FIELD_DEFAULTS = {
+    "field_name": "username",
+    "field_type": "text",
+    "field_selector": "#username",
+    "field_purpose": "username",
+    "preset_value": "testuser",
+    "is_sensitive": False,
+    "is_file_upload": False,
+    "is_required": True,
+    "options": None,
+    "sort_order": 0,
+    "created_at": _TIMESTAMP,
+    "updated_at": _TIMESTAMP,
+}
+
+_EXECUTION_LOG_DEFAULTS = {
+    "started_at": _TIMESTAMP,
+    "completed_at": None,
+    "status": "running",
+    "is_dry_run": False,
+    "retry_count": 0,
+    "error_message": None,
+    "screenshot_path": None,
+    "vnc_session_id": None,
+    "created_at": _TIMESTAMP,
+}
+
+
+def _make_model(defaults: dict, id_fields: tuple[str, ...], overrides: dict) -> SimpleNamespace:
+    obj = SimpleNamespace(**defaults)
+    for name in id_fields:
+        if name not in overrides:
+            setattr(obj, name, _next_uuid())
+    obj.__dict__.update(overrides)
     return obj
 
 
+def make_task(**overrides):
+    """Create a Task-like namespace with sensible defaults."""
+    return _make_model(_TASK_DEFAULTS, ("id",), overrides)
+
+
 def make_form_definition(**overrides):
-    """Create a FormDefinition-like MagicMock with sensible defaults."""
-    defaults = {
-        "id": uuid.uuid4(),
-        "task_id": uuid.uuid4(),
-        "step_order": 1,
-        "depends_on_step_order": None,
-        "page_url": "https://example.com/login",
-        "form_type": "login",
-        "form_selector": "#login-form",
-        "submit_selector": "#submit-btn",
-        "human_breakpoint": False,
-        "created_at": datetime.now(UTC),
-        "updated_at": datetime.now(UTC),
-    }
-    defaults.update(overrides)
-    obj = MagicMock()
-    for k, v in defaults.items():
-        setattr(obj, k, v)
-    return obj
+    """Create a FormDefinition-like namespace with sensible defaults."""
+    return _make_model(_FORM_DEFINITION_DEFAULTS, ("id", "task_id"), overrides)
 
 
 def make_form_field(**overrides):
-    """Create a FormField-like MagicMock with sensible defaults."""
-    defaults = {
-        "id": uuid.uuid4(),
-        "form_definition_id": uuid.uuid4(),
-        "field_name": "username",
-        "field_type": "text",
-        "field_selector": "#username",
-        "field_purpose": "username",
-        "preset_value": "testuser",
-        "is_sensitive": False,
-        "is_file_upload": False,
-        "is_required": True,
-        "options": None,
-        "sort_order": 0,
-        "created_at": datetime.now(UTC),
-        "updated_at": datetime.now(UTC),
-    }
-    defaults.update(overrides)
-    obj = MagicMock()
-    for k, v in defaults.items():
-        setattr(obj, k, v)
-    return obj
+    """Create a FormField-like namespace with sensible defaults."""
+    return _make_model(_FORM_FIELD_DEFAULTS, ("id", "form_definition_id"), overrides)
 
 
 def make_execution_log(**overrides):
-    """Create an ExecutionLog-like MagicMock with sensible defaults."""
-    defaults = {
-        "id": uuid.uuid4(),
-        "task_id": uuid.uuid4(),
-        "started_at": datetime.now(UTC),
-        "completed_at": None,
-        "status": "running",
-        "is_dry_run": False,
-        "retry_count": 0,
-        "error_message": None,
-        "screenshot_path": None,
-        "steps_log": [],
-        "vnc_session_id": None,
-        "created_at": datetime.now(UTC),
-    }
-    defaults.update(overrides)
-    obj = MagicMock()
-    for k, v in defaults.items():
-        setattr(obj, k, v)
-    return obj
+    """Create an ExecutionLog-like namespace with sensible defaults."""
+    overrides.setdefault("steps_log", [])
+    return _make_model(_EXECUTION_LOG_DEFAULTS, ("id", "task_id"), overrides)
 
 
 # ---------------------------------------------------------------------------
@@ -1,20 +1,15 @@
 """Tests for FastAPI endpoints (execute, health, VNC)."""
 
-import uuid
-import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from httpx import AsyncClient, ASGITransport
 
+from app.api.execute import _execution_results
+from app.main import app
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
-def _get_app():
-    """Import and return the FastAPI app, lazily to let patches take effect."""
-    from app.main import app
-    return app
-
-
 def _close_scheduled_coro(coro):
     """Test helper: consume background coroutine without running it."""
     coro.close()
@@ -26,15 +21,13 @@ def _close_scheduled_coro(coro):
 # ---------------------------------------------------------------------------
 
 
-@pytest.mark.asyncio
-async def test_execute_endpoint_starts_background():
+async def test_execute_endpoint_starts_background(fake_uuid):
     """POST /execute returns immediately with status=started."""
     with patch("app.api.execute.asyncio.create_task", side_effect=_close_scheduled_coro) as mock_create_task:
-        app = _get_app()
         transport = ASGITransport(app=app)
         async with AsyncClient(transport=transport, base_url="http://test") as ac:
             response = await ac.post("/execute", json={
-                "task_id": str(uuid.uuid4()),
+                "task_id": str(fake_uuid()),
                 "is_dry_run": False,
             })
 
@@ -47,15 +40,13 @@ async def test_execute_endpoint_starts_background():
     mock_create_task.assert_called_once()
 
 
-@pytest.mark.asyncio
-async def test_execute_endpoint_with_all_options():
+async def test_execute_endpoint_with_all_options(fake_uuid):
     """POST /execute accepts all optional parameters."""
     with patch("app.api.execute.asyncio.create_task", side_effect=_close_scheduled_coro):
-        app = _get_app()
         transport = ASGITransport(app=app)
         async with AsyncClient(transport=transport, base_url="http://test") as ac:
             response = await ac.post("/execute", json={
-                "task_id": str(uuid.uuid4()),
+                "task_id": str(fake_uuid()),
                 "is_dry_run": True,
                 "stealth_enabled": False,
                 "user_agent": "CustomBot/1.0",
@@ -67,12 +58,10 @@ async def test_execute_endpoint_with_all_options():
     assert data["status"] == "started"
 
 
-@pytest.mark.asyncio
-async def test_execute_status_running():
+async def test_execute_status_running(fake_uuid):
     """GET /execute/status/{task_id} returns running when no result yet."""
-    task_id = str(uuid.uuid4())
+    task_id = str(fake_uuid())
 
-    app = _get_app()
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         response = await ac.get(f"/execute/status/{task_id}")
@@ -83,12 +72,9 @@ async def test_execute_status_running():
     assert data["task_id"] == task_id
 
 
-@pytest.mark.asyncio
-async def test_execute_status_completed():
+async def test_execute_status_completed(fake_uuid):
     """GET /execute/status/{task_id} returns result when execution completed."""
-    from app.api.execute import _execution_results
-
-    task_id = str(uuid.uuid4())
+    task_id = str(fake_uuid())
     _execution_results[task_id] = {
         "execution_id": "exec-123",
         "status": "success",
@@ -96,7 +82,6 @@ async def test_execute_status_completed():
     }
 
     try:
-        app = _get_app()
         transport = ASGITransport(app=app)
         async with AsyncClient(transport=transport, base_url="http://test") as ac:
             response = await ac.get(f"/execute/status/{task_id}")
@@ -117,10 +102,8 @@ async def test_execute_status_completed():
 # ---------------------------------------------------------------------------
 
 
-@pytest.mark.asyncio
 async def test_health_check():
     """GET /health returns ok."""
-    app = _get_app()
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         response = await ac.get("/health")
@@ -135,7 +118,6 @@ async def test_health_check():
 # ---------------------------------------------------------------------------
 
 
-@pytest.mark.asyncio
 async def test_vnc_start_endpoint():
     """POST /vnc/start creates a VNC session."""
     mock_vnc = AsyncMock()
@@ -145,7 +127,6 @@ async def test_vnc_start_endpoint():
     })
 
     with patch("app.api.vnc.vnc_manager", mock_vnc):
-        app = _get_app()
         transport = ASGITransport(app=app)
         async with AsyncClient(transport=transport, base_url="http://test") as ac:
             response = await ac.post("/vnc/start", json={
@@ -159,7 +140,6 @@ async def test_vnc_start_endpoint():
     mock_vnc.start_session.assert_awaited_once_with("exec-123")
 
 
-@pytest.mark.asyncio
 async def test_vnc_resume_endpoint():
     """POST /vnc/resume signals a VNC session to resume."""
     mock_vnc = AsyncMock()
@@ -169,7 +149,6 @@ async def test_vnc_resume_endpoint():
     })
 
     with patch("app.api.vnc.vnc_manager", mock_vnc):
-        app = _get_app()
         transport = ASGITransport(app=app)
         async with AsyncClient(transport=transport, base_url="http://test") as ac:
             response = await ac.post("/vnc/resume", json={
@@ -182,14 +161,12 @@ async def test_vnc_resume_endpoint():
     assert data["status"] == "resumed"
 
 
-@pytest.mark.asyncio
 async def test_vnc_stop_endpoint():
     """POST /vnc/stop terminates a VNC session."""
     mock_vnc = AsyncMock()
     mock_vnc.stop_session = AsyncMock(return_value={"status": "stopped"})
 
     with patch("app.api.vnc.vnc_manager", mock_vnc):
-        app = _get_app()
         transport = ASGITransport(app=app)
         async with AsyncClient(transport=transport, base_url="http://test") as ac:
             response = await ac.post("/vnc/stop", json={
@@ -201,7 +178,6 @@ async def test_vnc_stop_endpoint():
     assert data["status"] == "stopped"
 
 
-@pytest.mark.asyncio
 async def test_vnc_resume_task_editing_endpoint():
     """POST /vnc/resume-task-editing signals a VNC session to resume during task editing."""
     mock_vnc = AsyncMock()
@@ -211,7 +187,6 @@ async def test_vnc_resume_task_editing_endpoint():
     })
 
     with patch("app.api.vnc.vnc_manager", mock_vnc):
-        app = _get_app()
         transport = ASGITransport(app=app)
         async with AsyncClient(transport=transport, base_url="http://test") as ac:
             response = await ac.post("/vnc/resume-task-editing", json={
@@ -9,6 +9,7 @@ from fastapi.testclient import TestClient
 from app.main import app
 from app.services.highlighter_registry import HighlighterRegistry, HighlighterSession
 from app.services.field_highlighter import FieldHighlighter
+from tests.conftest import _AsyncReturn
 
 
 client = TestClient(app)
@@ -35,18 +36,19 @@ def _make_mock_session(task_id: str = ANALYSIS_ID) -> HighlighterSession:
     """Create a mock HighlighterSession."""
     page = AsyncMock()
     page.url = "https://example.com/login"
-    page.main_frame = MagicMock()
-    page.evaluate = AsyncMock(return_value={"found": True, "matchCount": 1})
+    page.main_frame = object()  # only compared by identity
     page.goto = AsyncMock()
-    page.wait_for_timeout = AsyncMock()
-    page.wait_for_load_state = AsyncMock()
-    page.wait_for_function = AsyncMock()
-    page.wait_for_url = AsyncMock()
-    page.wait_for_event = AsyncMock()
-    page.eval_on_selector = AsyncMock()
-    page.query_selector = AsyncMock(return_value=MagicMock())
+    # Awaited on every navigation/submit but never asserted: plain stubs.
+    page.evaluate = _AsyncReturn({"found": True, "matchCount": 1})
+    page.wait_for_timeout = _AsyncReturn()
+    page.wait_for_load_state = _AsyncReturn()
+    page.wait_for_function = _AsyncReturn()
+    page.wait_for_url = _AsyncReturn()
+    page.wait_for_event = _AsyncReturn()
+    page.eval_on_selector = _AsyncReturn()
+    page.query_selector = _AsyncReturn(object())
     page.keyboard = MagicMock()
-    page.keyboard.press = AsyncMock()
+    page.keyboard.press = _AsyncReturn()
 
     locator = AsyncMock()
     locator.first = locator
@@ -84,12 +86,9 @@ def _make_mock_session(task_id: str = ANALYSIS_ID) -> HighlighterSession:
 
 
 @pytest.fixture(autouse=True)
-def clean_registry():
-    """Reset the registry before each test."""
-    registry = HighlighterRegistry.get_instance()
-    registry._sessions.clear()
-    yield
-    registry._sessions.clear()
+def clean_registry(monkeypatch):
+    """Give each test its own registry singleton, whatever ran before it."""
+    monkeypatch.setattr(HighlighterRegistry, "_instance", HighlighterRegistry())
 
 
 def _register_session(session=None):
@@ -368,7 +367,6 @@ def test_navigate_sets_busy_flag_and_clears_after_success():
         assert session.navigating is True
 
     session.page.goto = AsyncMock(side_effect=_goto)
-    session.page.wait_for_timeout = AsyncMock()
 
     resp = client.post("/editing/navigate", json={
         "task_id": ANALYSIS_ID,
@@ -434,7 +432,6 @@ def test_registry_singleton():
     assert r1 is r2
 
 
-@pytest.mark.asyncio
 async def test_registry_register_and_get():
     registry = HighlighterRegistry.get_instance()
     session = _make_mock_session("reg-test-001")
@@ -447,7 +444,6 @@ async def test_registry_register_and_get():
     await registry.remove("reg-test-001")
 
 
-@pytest.mark.asyncio
 async def test_registry_remove():
     registry = HighlighterRegistry.get_instance()
     session = _make_mock_session("reg-test-002")
@@ -458,14 +454,12 @@ async def test_registry_remove():
     assert registry.get("reg-test-002") is None
 
 
-@pytest.mark.asyncio
 async def test_registry_remove_nonexistent():
     registry = HighlighterRegistry.get_instance()
     removed = await registry.remove("nonexistent-id")
     assert removed is None
 
 
-@pytest.mark.asyncio
 async def test_registry_cleanup_session():
     registry = HighlighterRegistry.get_instance()
     session = _make_mock_session("cleanup-test")
@@ -478,7 +472,6 @@ async def test_registry_cleanup_session():
     session.browser.close.assert_called_once()
 
 
-@pytest.mark.asyncio
 async def test_registry_active_count():
     registry = HighlighterRegistry.get_instance()
     assert registry.active_count == 0
@@ -1,12 +1,18 @@
 """Tests for app.services.task_executor.TaskExecutor."""
 
-import uuid
-from datetime import datetime
-from unittest.mock import AsyncMock, MagicMock, patch, PropertyMock
+import os
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from cryptography.fernet import Fernet
 
+from app.config import settings
+from app.services import task_executor
+from app.services.task_executor import TaskExecutor
 from tests.conftest import (
+    _AsyncReturn,
+    _CallCounter,
     make_task,
     make_form_definition,
     make_form_field,
@@ -16,99 +22,125 @@ from tests.conftest import (
     _make_mock_playwright,
 )
 
+pytestmark = pytest.mark.executor
+
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
-def _setup_db_for_task(mock_db, task, form_defs, fields_by_form_def_id):
-    """Wire up mock_db.query(...).filter(...).first()/.all() chains.
+def _awaited_once_with(stub: _AsyncReturn, *args, **kwargs) -> None:
+    """Assert that *stub* was awaited exactly once, with exactly these arguments."""
+    assert stub.calls == [(args, kwargs)], stub.calls
+
 
-    ``fields_by_form_def_id`` maps form_def.id -> list of FormField mocks.
+class _FakeQuery:
+    """Minimal stand-in for a SQLAlchemy query chain.
+
+    ``filter()``/``order_by()`` return the query itself and ``first()``/``all()``
+    return the prepared rows. With *rows_by_key*, ``filter()`` picks the rows
+    keyed by the bound value of its ``Model.column == value`` criterion.
     """
 
-    def _query_side_effect(model):
-        q = MagicMock()
-
-        model_name = getattr(model, "__name__", "") or str(model)
-
-        if model_name == "Task":
-            q.filter.return_value.first.return_value = task
-            return q
-        elif model_name == "FormDefinition":
-            q.filter.return_value.order_by.return_value.all.return_value = form_defs
-            return q
-        elif model_name == "FormField":
-            # Called once per form_def during field filling
-            def _filter_side_effect(*args, **kwargs):
-                inner = MagicMock()
-                # We need to figure out which form_def_id was requested.
-                # The executor calls FormField.form_definition_id == form_def.id
-                # We'll match based on call order.
-                return inner
-
-            # Simpler approach: return fields in sequence via side_effect
-            q.filter.return_value.order_by.return_value.all = MagicMock(
-                side_effect=[
-                    fields_by_form_def_id.get(fd.id, []) for fd in form_defs
-                ]
-            )
-            return q
-
-        return q
-
-    mock_db.query = MagicMock(side_effect=_query_side_effect)
-
-
-def _build_executor_patches(page, browser):
-    """Return patches for async_playwright, apply_stealth, and ScreenshotStorage."""
-    context = _make_mock_context(page)
-    browser_mock = browser
-    browser_mock.new_context = AsyncMock(return_value=context)
-    pw_cm = _make_mock_playwright(browser_mock)
+    __slots__ = ("_rows", "_rows_by_key")
 
-    pw_patch = patch(
-        "app.services.task_executor.async_playwright",
-        return_value=pw_cm,
-    )
-    stealth_patch = patch(
-        "app.services.task_executor.apply_stealth",
-        AsyncMock(),
-    )
-    screenshot_storage_mock = MagicMock()
-    screenshot_storage_mock.upload_screenshot = MagicMock(return_value=("test-key", 12345))
-    screenshot_storage_patch = patch(
-        "app.services.task_executor.ScreenshotStorage.get_instance",
-        return_value=screenshot_storage_mock,
-    )
-    return pw_patch, stealth_patch, screenshot_storage_patch, context
+    def __init__(self, rows=(), rows_by_key=None):
+        self._rows = list(rows)
+        self._rows_by_key = rows_by_key
 
+    def filter(self, *criteria):
+        if self._rows_by_key is not None:
+            self._rows = self._rows_by_key.get(criteria[0].right.value, [])
+        return self
 
-def _make_two_phase_vnc_mock(session_id="vnc-test-session"):
-    """Create a VNC manager mock supporting the two-phase approach
-    (reserve_display + activate_vnc) used by the task executor."""
-    vnc = MagicMock()
+    def order_by(self, *args):
+        return self
 
-    resume_event = MagicMock()
-    vnc.sessions = {
-        session_id: {"resume_event": resume_event},
-    }
+    def first(self):
+        return self._rows[0] if self._rows else None
 
-    vnc.reserve_display = AsyncMock(return_value={
-        "session_id": session_id,
-        "display": ":99",
-    })
+    def all(self):
+        return self._rows
+
+
+class _FakeDB:
+    """In-memory stand-in for the Session calls TaskExecutor makes.
+
+    ``fields_by_form_def_id`` maps form_def.id -> list of FormField doubles.
+    Objects passed to ``add()`` are kept in ``added``.
+    """
+
+    def __init__(self, task, form_defs, fields_by_form_def_id):
+        self._rows = {"Task": [task], "FormDefinition": form_defs}
+        self._fields = fields_by_form_def_id
+        self.added = []
+        self.add = self.added.append
+        self.commit = _CallCounter()
+
+    def query(self, model):
+        if model.__name__ == "FormField":
+            return _FakeQuery(rows_by_key=self._fields)
+        return _FakeQuery(self._rows.get(model.__name__, ()))
 
-    vnc.activate_vnc = AsyncMock(return_value={
-        "vnc_url": "http://localhost:6080/vnc_lite.html?token=test",
-        "ws_port": 6080,
-    })
 
-    vnc.deactivate_vnc = MagicMock()
-    vnc.wait_for_resume = AsyncMock(return_value=True)
-    vnc.stop_session = AsyncMock(return_value={"status": "stopped"})
+@pytest.fixture
+def executor_env(monkeypatch):
+    """Patch Playwright, stealth, screenshot storage and broadcasting for TaskExecutor.
 
-    return vnc
+    Returns the page/browser/context doubles the executor will drive. Tests that
+    need a custom page behaviour override attributes on ``executor_env.page``.
+    """
+    page = _make_mock_page()
+    context = _make_mock_context(page)
+    browser = _make_mock_browser(context)
+    browser.close = _AsyncReturn()
+    pw_cm = _make_mock_playwright(browser)
+    stealth = _AsyncReturn()
+    screenshot_storage = MagicMock()
+    screenshot_storage.upload_screenshot = MagicMock(return_value=("test-key", 12345))
+    # No test inspects the broadcast arguments, so a call counter is enough.
+    broadcaster = SimpleNamespace(trigger_execution=_CallCounter())
+
+    monkeypatch.setattr(task_executor, "async_playwright", lambda: pw_cm)
+    monkeypatch.setattr(task_executor, "apply_stealth", stealth)
+    monkeypatch.setattr(task_executor.ScreenshotStorage, "get_instance", lambda: screenshot_storage)
+    monkeypatch.setattr(task_executor.Broadcaster, "get_instance", lambda: broadcaster)
+
+    return SimpleNamespace(
+        page=page,
+        context=context,
+        browser=browser,
+        stealth=stealth,
+        screenshot_storage=screenshot_storage,
+        broadcaster=broadcaster,
+    )
+
+
+# Payloads the two-phase VNC stub returns. TaskExecutor only reads them, so
+# every stub shares the same dicts.
+_VNC_SESSION_ID = "vnc-test-session"
+_VNC_RESERVED = {"session_id": _VNC_SESSION_ID, "display": ":99"}
+_VNC_ACTIVATED = {
+    "vnc_url": "http://localhost:6080/vnc_lite.html?token=test",
+    "ws_port": 6080,
+}
+_VNC_STOPPED = {"status": "stopped"}
+
+
+def _make_two_phase_vnc_mock(resumed=True):
+    """Create a VNC manager stub supporting the two-phase approach
+    (reserve_display + activate_vnc) used by the task executor.
+
+    Each coroutine is an ``_AsyncReturn`` whose ``calls`` the tests inspect.
+    """
+    return SimpleNamespace(
+        sessions={_VNC_SESSION_ID: {"resume_event": object()}},
+        reserve_display=_AsyncReturn(_VNC_RESERVED),
+        activate_vnc=_AsyncReturn(_VNC_ACTIVATED),
+        deactivate_vnc=_CallCounter(),
+        wait_for_resume=_AsyncReturn(resumed),
+        stop_session=_AsyncReturn(_VNC_STOPPED),
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -116,11 +148,10 @@ def _make_two_phase_vnc_mock(session_id="vnc-test-session"):
 # ---------------------------------------------------------------------------
 
 
-@pytest.mark.asyncio
-async def test_execute_simple_single_form(mock_db, mock_vnc_manager):
+async def test_execute_simple_single_form(executor_env, fake_uuid, mock_vnc_manager):
     """Successful execution of a single login form with two text fields."""
-    task_id = uuid.uuid4()
-    form_def_id = uuid.uuid4()
+    task_id = fake_uuid()
+    form_def_id = fake_uuid()
 
     task = make_task(id=task_id)
     form_def = make_form_definition(
@@ -142,179 +173,134 @@ async def test_execute_simple_single_form(mock_db, mock_vnc_manager):
         sort_order=1,
     )
 
-    _setup_db_for_task(mock_db, task, [form_def], {
+    db = _FakeDB(task, [form_def], {
         form_def_id: [username_field, password_field],
     })
 
-    page = _make_mock_page()
-    browser = _make_mock_browser(_make_mock_context(page))
-    pw_patch, stealth_patch, screenshot_patch, context = _build_executor_patches(page, browser)
-
-    with pw_patch, stealth_patch, screenshot_patch:
-        from app.services.task_executor import TaskExecutor
+    page = executor_env.page
 
-        executor = TaskExecutor(db=mock_db, vnc_manager=mock_vnc_manager)
-        result = await executor.execute(str(task_id))
+    executor = TaskExecutor(db=db, vnc_manager=mock_vnc_manager)
+    result = await executor.execute(task_id)
 
     assert result["status"] == "success"
     assert "execution_id" in result
     assert "screenshot" in result
 
     # Verify navigation
-    page.goto.assert_awaited_once()
-    assert page.goto.call_args[0][0] == "https://example.com/login"
+    assert [args[0] for args, _ in page.goto.calls] == ["https://example.com/login"]
 
     # Verify form selector was waited for
-    page.wait_for_selector.assert_awaited_once_with("#login-form", timeout=10000)
+    _awaited_once_with(page.wait_for_selector, "#login-form", timeout=10000)
 
     # Verify fields were filled
-    assert page.fill.await_count == 2
-    fill_calls = page.fill.call_args_list
-    assert fill_calls[0][0] == ("#username", "testuser")
-    assert fill_calls[1][0] == ("#password", "secret")
+    assert [args for args, _ in page.fill.calls] == [
+        ("#username", "testuser"),
+        ("#password", "secret"),
+    ]
 
     # Verify submit was clicked
-    page.click.assert_awaited_once()
-    assert page.click.call_args[0][0] == "#submit-btn"
-    assert page.click.call_args[1]["no_wait_after"] is True
+    _awaited_once_with(page.click, "#submit-btn", no_wait_after=True)
 
     # Verify screenshot taken
-    page.screenshot.assert_awaited_once()
+    assert len(page.screenshot.calls) == 1
 
     # Verify browser closed
-    browser.close.assert_awaited_once()
+    _awaited_once_with(executor_env.browser.close)
 
     # Verify DB commit was called (execution log updates)
-    assert mock_db.commit.call_count >= 2
-
-
-@pytest.mark.asyncio
-async def test_execute_multi_step(mock_db, mock_vnc_manager):
-    """Execution with two form steps: login -> target form."""
-    task_id = uuid.uuid4()
-    fd1_id = uuid.uuid4()
-    fd2_id = uuid.uuid4()
-
-    task = make_task(id=task_id)
-    form_def_1 = make_form_definition(
-        id=fd1_id, task_id=task_id, step_order=1,
-        page_url="https://example.com/login",
-        form_selector="#login-form", submit_selector="#login-submit",
-        human_breakpoint=False,
-    )
-    form_def_2 = make_form_definition(
-        id=fd2_id, task_id=task_id, step_order=2,
-        page_url="https://example.com/dashboard/form",
-        form_selector="#data-form", submit_selector="#data-submit",
-        human_breakpoint=False,
-    )
-    login_field = make_form_field(
-        form_definition_id=fd1_id, field_name="user",
-        field_type="text", field_selector="#user",
-        preset_value="admin", sort_order=0,
-    )
-    data_field = make_form_field(
-        form_definition_id=fd2_id, field_name="amount",
-        field_type="number", field_selector="#amount",
-        preset_value="100", sort_order=0,
-    )
-
-    _setup_db_for_task(mock_db, task, [form_def_1, form_def_2], {
-        fd1_id: [login_field],
-        fd2_id: [data_field],
-    })
-
-    page = _make_mock_page()
-    browser = _make_mock_browser(_make_mock_context(page))
-    pw_patch, stealth_patch, screenshot_patch, context = _build_executor_patches(page, browser)
-
-    with pw_patch, stealth_patch, screenshot_patch:
-        from app.services.task_executor import TaskExecutor
-
-        executor = TaskExecutor(db=mock_db, vnc_manager=mock_vnc_manager)
-        result = await executor.execute(str(task_id))
-
-    assert result["status"] == "success"
-
-    # Two navigations (one per step)
-    assert page.goto.await_count == 2
-    urls_navigated = [c[0][0] for c in page.goto.call_args_list]
-    assert urls_navigated[0] == "https://example.com/login"
-    assert urls_navigated[1] == "https://example.com/dashboard/form"
-
-    # Two submits
-    assert page.click.await_count == 2
-    submit_selectors = [c[0][0] for c in page.click.call_args_list]
-    assert "#login-submit" in submit_selectors
-    assert "#data-submit" in submit_selectors
-
-    # Two form selectors waited for
-    assert page.wait_for_selector.await_count == 2
-
-
-@pytest.mark.asyncio
-async def test_execute_multi_step_uses_dependency_graph_order(mock_db, mock_vnc_manager):
-    """Steps are executed in dependency order, not only by step_order."""
-    task_id = uuid.uuid4()
-    root_id = uuid.uuid4()
-    late_child_id = uuid.uuid4()
-    middle_child_id = uuid.uuid4()
-
+    assert db.commit.call_count >= 2
+
+
+# Each step is (name, step_order, depends_on_step_order, preset fill or None);
+# a step named "login" lives at https://example.com/login with #login-form and
+# #login-submit.
+MULTI_STEP_CASES = [
+    pytest.param(
+        [("login", 1, None, ("#user", "admin")), ("data", 2, None, ("#amount", "100"))],
+        False, ["login", "data"], ["login", "data"], "success",
+        id="two_step",
+    ),
+    # "late" has a lower step_order than "middle" but depends on it.
+    pytest.param(
+        [("root", 1, None, None), ("late", 2, 3, None), ("middle", 3, 1, None)],
+        False, ["root", "middle", "late"], ["root", "middle", "late"], "success",
+        id="dependency_order",
+    ),
+    # A dry run only skips the submit of the LAST step.
+    pytest.param(
+        [("login", 1, None, None), ("form", 2, None, None)],
+        True, ["login", "form"], ["login"], "dry_run_ok",
+        id="dry_run",
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "steps, is_dry_run, expected_order, expected_submits, expected_status", MULTI_STEP_CASES,
+)
+async def test_execute_multi_step(
+    executor_env, fake_uuid, mock_vnc_manager,
+    steps, is_dry_run, expected_order, expected_submits, expected_status,
+):
+    """Steps run in dependency order, each filling its own fields and submitting."""
+    task_id = fake_uuid()
     task = make_task(id=task_id)
-    root_step = make_form_definition(
-        id=root_id, task_id=task_id, step_order=1,
-        depends_on_step_order=None,
-        page_url="https://example.com/root",
-        form_selector="#root-form", submit_selector="#root-submit",
-        human_breakpoint=False,
-    )
-    # This one has a lower step_order but depends on step 3.
-    late_child_step = make_form_definition(
-        id=late_child_id, task_id=task_id, step_order=2,
-        depends_on_step_order=3,
-        page_url="https://example.com/late-child",
-        form_selector="#late-form", submit_selector="#late-submit",
-        human_breakpoint=False,
-    )
-    middle_child_step = make_form_definition(
-        id=middle_child_id, task_id=task_id, step_order=3,
-        depends_on_step_order=1,
-        page_url="https://example.com/middle-child",
-        form_selector="#middle-form", submit_selector="#middle-submit",
-        human_breakpoint=False,
-    )
-
-    _setup_db_for_task(mock_db, task, [root_step, late_child_step, middle_child_step], {
-        root_id: [],
-        late_child_id: [],
-        middle_child_id: [],
-    })
 
-    page = _make_mock_page()
-    browser = _make_mock_browser(_make_mock_context(page))
-    pw_patch, stealth_patch, screenshot_patch, context = _build_executor_patches(page, browser)
-
-    with pw_patch, stealth_patch, screenshot_patch:
-        from app.services.task_executor import TaskExecutor
-
-        executor = TaskExecutor(db=mock_db, vnc_manager=mock_vnc_manager)
-        result = await executor.execute(str(task_id))
+    form_defs, fields, fills = [], {}, {}
+    for name, step_order, depends_on, fill in steps:
+        form_def = make_form_definition(
+            id=fake_uuid(), task_id=task_id, step_order=step_order,
+            depends_on_step_order=depends_on,
+            page_url=f"https://example.com/{name}",
+            form_selector=f"#{name}-form", submit_selector=f"#{name}-submit",
+            human_breakpoint=False,
+        )
+        form_defs.append(form_def)
+        fields[form_def.id] = []
+        if fill is not None:
+            selector, value = fill
+            fields[form_def.id].append(make_form_field(
+                form_definition_id=form_def.id, field_name=selector[1:],
+                field_type="text", field_selector=selector,
+                preset_value=value, sort_order=0,
+            ))
+            fills[name] = fill
+
+    db = _FakeDB(task, form_defs, fields)
+
+    page = executor_env.page
+
+    executor = TaskExecutor(db=db, vnc_manager=mock_vnc_manager)
+    result = await executor.execute(task_id, is_dry_run=is_dry_run)
+
+    assert result["status"] == expected_status
+
+    # One navigation and one form wait per step, in execution order
+    assert [args[0] for args, _ in page.goto.calls] == [
+        f"https://example.com/{name}" for name in expected_order
+    ]
+    assert [args[0] for args, _ in page.wait_for_selector.calls] == [
+        f"#{name}-form" for name in expected_order
+    ]
 
-    assert result["status"] == "success"
+    # Each step filled its own fields
+    assert [args for args, _ in page.fill.calls] == [
+        fills[name] for name in expected_order if name in fills
+    ]
 
-    visited_urls = [call[0][0] for call in page.goto.call_args_list]
-    assert visited_urls == [
-        "https://example.com/root",
-        "https://example.com/middle-child",
-        "https://example.com/late-child",
+    # Every submitted step clicks without waiting for navigation
+    assert page.click.calls == [
+        ((f"#{name}-submit",), {"no_wait_after": True}) for name in expected_submits
     ]
 
+    # Final screenshot was taken
+    assert len(page.screenshot.calls) == 1
+
 
-@pytest.mark.asyncio
-async def test_execute_dry_run(mock_db, mock_vnc_manager):
+async def test_execute_dry_run(executor_env, fake_uuid, mock_vnc_manager):
     """Dry run stops before final submit and returns dry_run_ok."""
-    task_id = uuid.uuid4()
-    fd_id = uuid.uuid4()
+    task_id = fake_uuid()
+    fd_id = fake_uuid()
 
     task = make_task(id=task_id)
     form_def = make_form_definition(
@@ -329,41 +315,46 @@ async def test_execute_dry_run(mock_db, mock_vnc_manager):
         preset_value="John", sort_order=0,
     )
 
-    _setup_db_for_task(mock_db, task, [form_def], {fd_id: [field]})
+    db = _FakeDB(task, [form_def], {fd_id: [field]})
 
-    page = _make_mock_page()
-    browser = _make_mock_browser(_make_mock_context(page))
-    pw_patch, stealth_patch, screenshot_patch, context = _build_executor_patches(page, browser)
-
-    with pw_patch, stealth_patch, screenshot_patch:
-        from app.services.task_executor import TaskExecutor
+    page = executor_env.page
 
-        executor = TaskExecutor(db=mock_db, vnc_manager=mock_vnc_manager)
-        result = await executor.execute(str(task_id), is_dry_run=True)
+    executor = TaskExecutor(db=db, vnc_manager=mock_vnc_manager)
+    result = await executor.execute(task_id, is_dry_run=True)
 
     assert result["status"] == "dry_run_ok"
     assert "screenshot" in result
 
     # Field was filled
-    page.fill.assert_awaited_once_with("#name", "John")
+    _awaited_once_with(page.fill, "#name", "John")
 
     # Submit was NOT clicked (dry run)
-    page.click.assert_not_awaited()
+    assert page.click.calls == []
 
     # Screenshot was taken
-    page.screenshot.assert_awaited_once()
-    screenshot_kwargs = page.screenshot.call_args[1]
+    assert len(page.screenshot.calls) == 1
+    _, screenshot_kwargs = page.screenshot.calls[0]
     assert screenshot_kwargs["full_page"] is True
 
     # Browser was closed
-    browser.close.assert_awaited_once()
+    _awaited_once_with(executor_env.browser.close)
 
 
-@pytest.mark.asyncio
-async def test_execute_with_human_breakpoint_triggers_vnc_pause(mock_db):
-    """When human_breakpoint=True, a VNC pause is triggered for manual intervention."""
-    task_id = uuid.uuid4()
-    fd_id = uuid.uuid4()
+@pytest.mark.parametrize("resumed, expected_status", [
+    pytest.param(True, "success", id="resumed"),
+    pytest.param(False, "failed", id="timeout"),
+])
+async def test_execute_with_human_breakpoint_triggers_vnc_pause(
+    executor_env, fake_uuid, resumed, expected_status,
+):
+    """When human_breakpoint=True, a VNC pause is triggered for manual intervention.
+
+    If the user never resumes, execution fails and the session is still stopped
+    (regression: the early return after a _vnc_pause timeout skipped
+    stop_session).
+    """
+    task_id = fake_uuid()
+    fd_id = fake_uuid()
 
     task = make_task(id=task_id)
     form_def = make_form_definition(
@@ -378,155 +369,48 @@ async def test_execute_with_human_breakpoint_triggers_vnc_pause(mock_db):
         preset_value="Test", sort_order=0,
     )
 
-    _setup_db_for_task(mock_db, task, [form_def], {fd_id: [field]})
+    db = _FakeDB(task, [form_def], {fd_id: [field]})
 
-    page = _make_mock_page()
-    browser = _make_mock_browser(_make_mock_context(page))
-    pw_patch, stealth_patch, screenshot_patch, context = _build_executor_patches(page, browser)
-
-    vnc_mock = _make_two_phase_vnc_mock()
-
-    broadcaster_patch = patch(
-        "app.services.task_executor.Broadcaster.get_instance",
-        return_value=MagicMock(),
-    )
+    vnc_mock = _make_two_phase_vnc_mock(resumed=resumed)
 
-    with pw_patch, stealth_patch, screenshot_patch, broadcaster_patch:
-        from app.services.task_executor import TaskExecutor
+    executor = TaskExecutor(db=db, vnc_manager=vnc_mock)
+    result = await executor.execute(task_id)
 
-        executor = TaskExecutor(db=mock_db, vnc_manager=vnc_mock)
-        result = await executor.execute(str(task_id))
+    assert result["status"] == expected_status
+    if not resumed:
+        assert "VNC timeout" in result["error"]
 
-    assert result["status"] == "success"
+    # Submit is clicked only once the user has resumed
+    expected_clicks = [(("#submit",), {"no_wait_after": True})] if resumed else []
+    assert executor_env.page.click.calls == expected_clicks
 
     # VNC display was reserved
-    vnc_mock.reserve_display.assert_awaited_once()
+    assert len(vnc_mock.reserve_display.calls) == 1
 
     # VNC was activated for manual intervention
-    vnc_mock.activate_vnc.assert_awaited_once()
+    assert len(vnc_mock.activate_vnc.calls) == 1
 
     # VNC was waited on
-    vnc_mock.wait_for_resume.assert_awaited_once()
-
-    # VNC was stopped after execution
-    vnc_mock.stop_session.assert_awaited_once()
-
-
-@pytest.mark.asyncio
-async def test_execute_with_breakpoint_triggers_post_submit_vnc(mock_db):
-    """When human_breakpoint=True, VNC pause is triggered for manual intervention during execution."""
-    task_id = uuid.uuid4()
-    fd_id = uuid.uuid4()
-
-    task = make_task(id=task_id)
-    form_def = make_form_definition(
-        id=fd_id, task_id=task_id, step_order=1,
-        page_url="https://example.com/login",
-        form_selector="#login-form", submit_selector="#submit",
-        human_breakpoint=True,
-    )
-    field = make_form_field(
-        form_definition_id=fd_id, field_name="user",
-        field_type="text", field_selector="#user",
-        preset_value="admin", sort_order=0,
-    )
-
-    _setup_db_for_task(mock_db, task, [form_def], {fd_id: [field]})
-
-    page = _make_mock_page()
-    browser = _make_mock_browser(_make_mock_context(page))
-    pw_patch, stealth_patch, screenshot_patch, context = _build_executor_patches(page, browser)
-
-    vnc_mock = _make_two_phase_vnc_mock()
-
-    broadcaster_patch = patch(
-        "app.services.task_executor.Broadcaster.get_instance",
-        return_value=MagicMock(),
-    )
-
-    with pw_patch, stealth_patch, screenshot_patch, broadcaster_patch:
-        from app.services.task_executor import TaskExecutor
-
-        executor = TaskExecutor(db=mock_db, vnc_manager=vnc_mock)
-        result = await executor.execute(str(task_id))
-
-    assert result["status"] == "success"
-
-    # Submit was clicked (manual intervention pause is POST-submit)
-    page.click.assert_awaited_once()
-    assert page.click.call_args[0][0] == "#submit"
-    assert page.click.call_args[1]["no_wait_after"] is True
-
-    # VNC display was reserved and activated for manual intervention
-    vnc_mock.reserve_display.assert_awaited_once()
-    vnc_mock.activate_vnc.assert_awaited_once()
-    vnc_mock.wait_for_resume.assert_awaited_once()
-
-
-@pytest.mark.asyncio
-async def test_execute_vnc_timeout_fails(mock_db):
-    """When VNC wait_for_resume times out, execution fails."""
-    task_id = uuid.uuid4()
-    fd_id = uuid.uuid4()
-
-    task = make_task(id=task_id)
-    form_def = make_form_definition(
-        id=fd_id, task_id=task_id, step_order=1,
-        page_url="https://example.com/test",
-        form_selector="#form", submit_selector="#submit",
-        human_breakpoint=True,
-    )
-
-    _setup_db_for_task(mock_db, task, [form_def], {fd_id: []})
-
-    page = _make_mock_page()
-    browser = _make_mock_browser(_make_mock_context(page))
-    pw_patch, stealth_patch, screenshot_patch, context = _build_executor_patches(page, browser)
-
-    # VNC times out
-    vnc_mock = _make_two_phase_vnc_mock()
-    vnc_mock.wait_for_resume = AsyncMock(return_value=False)
-
-    broadcaster_patch = patch(
-        "app.services.task_executor.Broadcaster.get_instance",
-        return_value=MagicMock(),
-    )
+    assert len(vnc_mock.wait_for_resume.calls) == 1
 
-    with pw_patch, stealth_patch, screenshot_patch, broadcaster_patch:
-        from app.services.task_executor import TaskExecutor
+    # VNC was stopped after execution (via finally block on timeout)
+    assert len(vnc_mock.stop_session.calls) == 1
 
-        executor = TaskExecutor(db=mock_db, vnc_manager=vnc_mock)
-        result = await executor.execute(str(task_id))
 
-    assert result["status"] == "failed"
-    assert "VNC timeout" in result["error"]
-
-    # VNC session cleaned up via finally block
-    vnc_mock.stop_session.assert_awaited_once()
-
-
-@pytest.mark.asyncio
-async def test_execute_task_not_found(mock_db, mock_vnc_manager):
+async def test_execute_task_not_found(executor_env, mock_db, mock_vnc_manager):
     """execute raises ValueError when the task does not exist."""
     mock_db.query.return_value.filter.return_value.first.return_value = None
 
-    screenshot_storage_mock = MagicMock()
-    screenshot_storage_mock.upload_screenshot = MagicMock(return_value=("test-key", 12345))
+    executor = TaskExecutor(db=mock_db, vnc_manager=mock_vnc_manager)
 
-    with patch("app.services.task_executor.ScreenshotStorage.get_instance", return_value=screenshot_storage_mock):
-        from app.services.task_executor import TaskExecutor
+    with pytest.raises(ValueError, match="not found"):
+        await executor.execute("nonexistent-task-id")
 
-        executor = TaskExecutor(db=mock_db, vnc_manager=mock_vnc_manager)
 
-        with pytest.raises(ValueError, match="not found"):
-            await executor.execute("nonexistent-task-id")
-
-
-@pytest.mark.asyncio
-async def test_execute_form_selector_not_found(mock_db, mock_vnc_manager):
+async def test_execute_form_selector_not_found(executor_env, fake_uuid, mock_vnc_manager):
     """When the form selector is not found on the page, execution fails."""
-    task_id = uuid.uuid4()
-    fd_id = uuid.uuid4()
+    task_id = fake_uuid()
+    fd_id = fake_uuid()
 
     task = make_task(id=task_id)
     form_def = make_form_definition(
@@ -536,28 +420,22 @@ async def test_execute_form_selector_not_found(mock_db, mock_vnc_manager):
         human_breakpoint=False,
     )
 
-    _setup_db_for_task(mock_db, task, [form_def], {fd_id: []})
+    db = _FakeDB(task, [form_def], {fd_id: []})
 
-    page = _make_mock_page()
+    page = executor_env.page
     page.wait_for_selector = AsyncMock(side_effect=Exception("Timeout 10000ms exceeded"))
-    browser = _make_mock_browser(_make_mock_context(page))
-    pw_patch, stealth_patch, screenshot_patch, context = _build_executor_patches(page, browser)
-
-    with pw_patch, stealth_patch, screenshot_patch:
-        from app.services.task_executor import TaskExecutor
 
-        executor = TaskExecutor(db=mock_db, vnc_manager=mock_vnc_manager)
-        result = await executor.execute(str(task_id))
+    executor = TaskExecutor(db=db, vnc_manager=mock_vnc_manager)
+    result = await executor.execute(task_id)
 
     assert result["status"] == "failed"
     assert "not found" in result["error"]
 
 
-@pytest.mark.asyncio
-async def test_execute_stealth_mode(mock_db, mock_vnc_manager):
+async def test_execute_stealth_mode(executor_env, fake_uuid, mock_vnc_manager):
     """Stealth is applied when stealth_enabled=True."""
-    task_id = uuid.uuid4()
-    fd_id = uuid.uuid4()
+    task_id = fake_uuid()
+    fd_id = fake_uuid()
 
     task = make_task(id=task_id)
     form_def = make_form_definition(
@@ -567,120 +445,47 @@ async def test_execute_stealth_mode(mock_db, mock_vnc_manager):
         human_breakpoint=False,
     )
 
-    _setup_db_for_task(mock_db, task, [form_def], {fd_id: []})
+    db = _FakeDB(task, [form_def], {fd_id: []})
 
-    page = _make_mock_page()
-    browser = _make_mock_browser(_make_mock_context(page))
-    stealth_mock = AsyncMock()
-    context = _make_mock_context(page)
-    browser.new_context = AsyncMock(return_value=context)
-    pw_cm = _make_mock_playwright(browser)
-
-    pw_patch = patch(
-        "app.services.task_executor.async_playwright",
-        return_value=pw_cm,
-    )
-    stealth_patch = patch(
-        "app.services.task_executor.apply_stealth",
-        stealth_mock,
-    )
-    screenshot_storage_mock = MagicMock()
-    screenshot_storage_mock.upload_screenshot = MagicMock(return_value=("test-key", 12345))
-    screenshot_patch = patch(
-        "app.services.task_executor.ScreenshotStorage.get_instance",
-        return_value=screenshot_storage_mock,
-    )
-
-    with pw_patch, stealth_patch, screenshot_patch:
-        from app.services.task_executor import TaskExecutor
-
-        executor = TaskExecutor(db=mock_db, vnc_manager=mock_vnc_manager)
-        await executor.execute(str(task_id), stealth_enabled=True)
-
-    stealth_mock.assert_awaited_once_with(context)
-
-
-@pytest.mark.asyncio
-async def test_execute_field_filling_select(mock_db, mock_vnc_manager):
-    """Select fields use page.select_option."""
-    task_id = uuid.uuid4()
-    fd_id = uuid.uuid4()
-
-    task = make_task(id=task_id)
-    form_def = make_form_definition(
-        id=fd_id, task_id=task_id, step_order=1,
-        form_selector="#form", submit_selector="#submit",
-        human_breakpoint=False,
-    )
-    select_field = make_form_field(
-        form_definition_id=fd_id, field_name="country",
-        field_type="select", field_selector="#country",
-        preset_value="US", sort_order=0,
-    )
-
-    _setup_db_for_task(mock_db, task, [form_def], {fd_id: [select_field]})
-
-    page = _make_mock_page()
-    browser = _make_mock_browser(_make_mock_context(page))
-    pw_patch, stealth_patch, screenshot_patch, context = _build_executor_patches(page, browser)
-
-    with pw_patch, stealth_patch, screenshot_patch:
-        from app.services.task_executor import TaskExecutor
-
-        executor = TaskExecutor(db=mock_db, vnc_manager=mock_vnc_manager)
-        result = await executor.execute(str(task_id))
-
-    assert result["status"] == "success"
-    page.select_option.assert_awaited_once_with("#country", "US")
-
-
-@pytest.mark.asyncio
-async def test_execute_field_filling_checkbox(mock_db, mock_vnc_manager):
-    """Checkbox fields use page.check / page.uncheck based on value."""
-    task_id = uuid.uuid4()
-    fd_id = uuid.uuid4()
-
-    task = make_task(id=task_id)
-    form_def = make_form_definition(
-        id=fd_id, task_id=task_id, step_order=1,
-        form_selector="#form", submit_selector="#submit",
-        human_breakpoint=False,
-    )
-    checkbox_on = make_form_field(
-        form_definition_id=fd_id, field_name="agree",
-        field_type="checkbox", field_selector="#agree",
-        preset_value="true", sort_order=0,
-    )
-    checkbox_off = make_form_field(
-        form_definition_id=fd_id, field_name="newsletter",
-        field_type="checkbox", field_selector="#newsletter",
-        preset_value="false", sort_order=1,
-    )
-
-    _setup_db_for_task(mock_db, task, [form_def], {
-        fd_id: [checkbox_on, checkbox_off],
-    })
+    executor = TaskExecutor(db=db, vnc_manager=mock_vnc_manager)
+    await executor.execute(task_id, stealth_enabled=True)
 
-    page = _make_mock_page()
-    browser = _make_mock_browser(_make_mock_context(page))
-    pw_patch, stealth_patch, screenshot_patch, context = _build_executor_patches(page, browser)
-
-    with pw_patch, stealth_patch, screenshot_patch:
-        from app.services.task_executor import TaskExecutor
+    _awaited_once_with(executor_env.stealth, executor_env.context)
 
-        executor = TaskExecutor(db=mock_db, vnc_manager=mock_vnc_manager)
-        result = await executor.execute(str(task_id))
-
-    assert result["status"] == "success"
-    page.check.assert_awaited_once_with("#agree")
-    page.uncheck.assert_awaited_once_with("#newsletter")
 
+FIELD_FILL_METHODS = (
+    "fill", "select_option", "check", "uncheck", "set_input_files", "eval_on_selector",
+)
 
-@pytest.mark.asyncio
-async def test_execute_field_filling_file_upload(mock_db, mock_vnc_manager):
-    """File upload fields use page.set_input_files."""
-    task_id = uuid.uuid4()
-    fd_id = uuid.uuid4()
+FIELD_CASES = [
+    pytest.param("text", "John", False, "fill", ("#field", "John"), id="text"),
+    pytest.param("select", "US", False, "select_option", ("#field", "US"), id="select"),
+    pytest.param("checkbox", "true", False, "check", ("#field",), id="checkbox_on"),
+    pytest.param("checkbox", "false", False, "uncheck", ("#field",), id="checkbox_off"),
+    pytest.param("radio", "yes", False, "check", ('#field[value="yes"]',), id="radio"),
+    pytest.param(
+        "file", "report.pdf", True, "set_input_files",
+        ("#field", os.path.join(settings.upload_dir, "report.pdf")), id="file_upload",
+    ),
+    pytest.param(
+        "hidden", "abc123", False, "eval_on_selector",
+        ("#field", "(el, val) => el.value = val", "abc123"), id="hidden",
+    ),
+    # Fields with preset_value=None are skipped during filling.
+    pytest.param("text", None, False, None, None, id="no_preset_skipped"),
+]
+
+
+@pytest.mark.parametrize(
+    "field_type, preset_value, is_file_upload, method, expected_args", FIELD_CASES,
+)
+async def test_execute_field_filling(
+    executor_env, fake_uuid, mock_vnc_manager,
+    field_type, preset_value, is_file_upload, method, expected_args,
+):
+    """Each field type is filled through the matching Page method."""
+    task_id = fake_uuid()
+    fd_id = fake_uuid()
 
     task = make_task(id=task_id)
     form_def = make_form_definition(
@@ -688,73 +493,41 @@ async def test_execute_field_filling_file_upload(mock_db, mock_vnc_manager):
         form_selector="#form", submit_selector="#submit",
         human_breakpoint=False,
     )
-    file_field = make_form_field(
-        form_definition_id=fd_id, field_name="document",
-        field_type="file", field_selector="#document",
-        preset_value="report.pdf", is_file_upload=True, sort_order=0,
+    field = make_form_field(
+        form_definition_id=fd_id, field_name="field",
+        field_type=field_type, field_selector="#field",
+        preset_value=preset_value, is_file_upload=is_file_upload, sort_order=0,
     )
 
-    _setup_db_for_task(mock_db, task, [form_def], {fd_id: [file_field]})
-
-    page = _make_mock_page()
-    browser = _make_mock_browser(_make_mock_context(page))
-    pw_patch, stealth_patch, screenshot_patch, context = _build_executor_patches(page, browser)
+    db = _FakeDB(task, [form_def], {fd_id: [field]})
 
-    with pw_patch, stealth_patch, screenshot_patch:
-        from app.services.task_executor import TaskExecutor
+    page = executor_env.page
 
-        executor = TaskExecutor(db=mock_db, vnc_manager=mock_vnc_manager)
-        result = await executor.execute(str(task_id))
+    executor = TaskExecutor(db=db, vnc_manager=mock_vnc_manager)
+    result = await executor.execute(task_id)
 
     assert result["status"] == "success"
-    page.set_input_files.assert_awaited_once()
-    call_args = page.set_input_files.call_args[0]
-    assert call_args[0] == "#document"
-    assert "report.pdf" in call_args[1]
-
-
-@pytest.mark.asyncio
-async def test_execute_field_filling_hidden(mock_db, mock_vnc_manager):
-    """Hidden fields use page.eval_on_selector to set value."""
-    task_id = uuid.uuid4()
-    fd_id = uuid.uuid4()
-
-    task = make_task(id=task_id)
-    form_def = make_form_definition(
-        id=fd_id, task_id=task_id, step_order=1,
-        form_selector="#form", submit_selector="#submit",
-        human_breakpoint=False,
-    )
-    hidden_field = make_form_field(
-        form_definition_id=fd_id, field_name="token",
-        field_type="hidden", field_selector="#token",
-        preset_value="abc123", sort_order=0,
-    )
-
-    _setup_db_for_task(mock_db, task, [form_def], {fd_id: [hidden_field]})
-
-    page = _make_mock_page()
-    browser = _make_mock_browser(_make_mock_context(page))
-    pw_patch, stealth_patch, screenshot_patch, context = _build_executor_patches(page, browser)
+    assert {name: getattr(page, name).calls for name in FIELD_FILL_METHODS} == {
+        name: [(expected_args, {})] if name == method else [] for name in FIELD_FILL_METHODS
+    }
 
-    with pw_patch, stealth_patch, screenshot_patch:
-        from app.services.task_executor import TaskExecutor
 
-        executor = TaskExecutor(db=mock_db, vnc_manager=mock_vnc_manager)
-        result = await executor.execute(str(task_id))
+@pytest.fixture(scope="module")
+def encrypted_secret():
+    """A Fernet key and a token encrypting "s3cret", generated once per module."""
+    key = Fernet.generate_key().decode()
+    return key, Fernet(key.encode()).encrypt(b"s3cret").decode()
 
-    assert result["status"] == "success"
-    page.eval_on_selector.assert_awaited_once()
-    call_args = page.eval_on_selector.call_args[0]
-    assert call_args[0] == "#token"
-    assert call_args[2] == "abc123"
 
+async def test_execute_decrypts_sensitive_field(
+    executor_env, fake_uuid, mock_vnc_manager, monkeypatch, encrypted_secret,
+):
+    """Sensitive preset values are decrypted with the configured key before filling."""
+    key, token = encrypted_secret
+    monkeypatch.setattr(settings, "encryption_key", key)
 
-@pytest.mark.asyncio
-async def test_execute_skips_field_with_no_preset(mock_db, mock_vnc_manager):
-    """Fields with preset_value=None are skipped during filling."""
-    task_id = uuid.uuid4()
-    fd_id = uuid.uuid4()
+    task_id = fake_uuid()
+    fd_id = fake_uuid()
 
     task = make_task(id=task_id)
     form_def = make_form_definition(
@@ -762,36 +535,25 @@ async def test_execute_skips_field_with_no_preset(mock_db, mock_vnc_manager):
         form_selector="#form", submit_selector="#submit",
         human_breakpoint=False,
     )
-    no_value_field = make_form_field(
-        form_definition_id=fd_id, field_name="optional",
-        field_type="text", field_selector="#optional",
-        preset_value=None, sort_order=0,
+    field = make_form_field(
+        form_definition_id=fd_id, field_name="password",
+        field_type="password", field_selector="#password",
+        preset_value=token, is_sensitive=True, sort_order=0,
     )
 
-    _setup_db_for_task(mock_db, task, [form_def], {fd_id: [no_value_field]})
-
-    page = _make_mock_page()
-    browser = _make_mock_browser(_make_mock_context(page))
-    pw_patch, stealth_patch, screenshot_patch, context = _build_executor_patches(page, browser)
-
-    with pw_patch, stealth_patch, screenshot_patch:
-        from app.services.task_executor import TaskExecutor
+    db = _FakeDB(task, [form_def], {fd_id: [field]})
 
-        executor = TaskExecutor(db=mock_db, vnc_manager=mock_vnc_manager)
-        result = await executor.execute(str(task_id))
+    executor = TaskExecutor(db=db, vnc_manager=mock_vnc_manager)
+    result = await executor.execute(task_id)
 
     assert result["status"] == "success"
-    # No fill/select/check methods should have been called
-    page.fill.assert_not_awaited()
-    page.select_option.assert_not_awaited()
-    page.check.assert_not_awaited()
+    _awaited_once_with(executor_env.page.fill, "#password", "s3cret")
 
 
-@pytest.mark.asyncio
-async def test_execute_field_error_continues(mock_db, mock_vnc_manager):
+async def test_execute_field_error_continues(executor_env, fake_uuid, mock_vnc_manager):
     """If a field fill fails, the error is logged but execution continues."""
-    task_id = uuid.uuid4()
-    fd_id = uuid.uuid4()
+    task_id = fake_uuid()
+    fd_id = fake_uuid()
 
     task = make_task(id=task_id)
     form_def = make_form_definition(
@@ -810,19 +572,14 @@ async def test_execute_field_error_continues(mock_db, mock_vnc_manager):
         preset_value="ok", sort_order=1,
     )
 
-    _setup_db_for_task(mock_db, task, [form_def], {fd_id: [bad_field, good_field]})
+    db = _FakeDB(task, [form_def], {fd_id: [bad_field, good_field]})
 
-    page = _make_mock_page()
+    page = executor_env.page
     # First fill call fails, second succeeds
     page.fill = AsyncMock(side_effect=[Exception("Element not found"), None])
-    browser = _make_mock_browser(_make_mock_context(page))
-    pw_patch, stealth_patch, screenshot_patch, context = _build_executor_patches(page, browser)
 
-    with pw_patch, stealth_patch, screenshot_patch:
-        from app.services.task_executor import TaskExecutor
-
-        executor = TaskExecutor(db=mock_db, vnc_manager=mock_vnc_manager)
-        result = await executor.execute(str(task_id))
+    executor = TaskExecutor(db=db, vnc_manager=mock_vnc_manager)
+    result = await executor.execute(task_id)
 
     # Execution still succeeds (field errors are non-fatal)
     assert result["status"] == "success"
@@ -830,68 +587,20 @@ async def test_execute_field_error_continues(mock_db, mock_vnc_manager):
     assert page.fill.await_count == 2
 
 
-@pytest.mark.asyncio
-async def test_execute_dry_run_multi_step(mock_db, mock_vnc_manager):
-    """In a multi-step dry run, only the LAST step skips submit."""
-    task_id = uuid.uuid4()
-    fd1_id = uuid.uuid4()
-    fd2_id = uuid.uuid4()
-
-    task = make_task(id=task_id)
-    form_def_1 = make_form_definition(
-        id=fd1_id, task_id=task_id, step_order=1,
-        page_url="https://example.com/login",
-        form_selector="#login", submit_selector="#login-btn",
-        human_breakpoint=False,
-    )
-    form_def_2 = make_form_definition(
-        id=fd2_id, task_id=task_id, step_order=2,
-        page_url="https://example.com/form",
-        form_selector="#form", submit_selector="#submit-btn",
-        human_breakpoint=False,
-    )
-
-    _setup_db_for_task(mock_db, task, [form_def_1, form_def_2], {
-        fd1_id: [],
-        fd2_id: [],
-    })
-
-    page = _make_mock_page()
-    browser = _make_mock_browser(_make_mock_context(page))
-    pw_patch, stealth_patch, screenshot_patch, context = _build_executor_patches(page, browser)
-
-    with pw_patch, stealth_patch, screenshot_patch:
-        from app.services.task_executor import TaskExecutor
-
-        executor = TaskExecutor(db=mock_db, vnc_manager=mock_vnc_manager)
-        result = await executor.execute(str(task_id), is_dry_run=True)
-
-    assert result["status"] == "dry_run_ok"
-
-    # First step's submit WAS clicked (dry run only skips the last step)
-    page.click.assert_awaited_once()
-    assert page.click.call_args[0][0] == "#login-btn"
-    assert page.click.call_args[1]["no_wait_after"] is True
-
-    # Screenshot was taken
-    page.screenshot.assert_awaited_once()
-
-
 # ---------------------------------------------------------------------------
 # Bug fix regression tests
 # ---------------------------------------------------------------------------
 
 
-@pytest.mark.asyncio
-async def test_no_duplicate_step_in_steps_log_after_manual_intervention(mock_db):
+async def test_no_duplicate_step_in_steps_log_after_manual_intervention(executor_env, fake_uuid):
     """After manual intervention is resolved, steps_log should contain exactly one entry
     per step — no duplicates from _vnc_pause + main loop both appending.
 
     Regression test for: _vnc_pause appended step_info to steps_log, then
     the main loop appended it again after submit, causing duplicate entries.
     """
-    task_id = uuid.uuid4()
-    fd_id = uuid.uuid4()
+    task_id = fake_uuid()
+    fd_id = fake_uuid()
 
     task = make_task(id=task_id)
     form_def = make_form_definition(
@@ -906,34 +615,18 @@ async def test_no_duplicate_step_in_steps_log_after_manual_intervention(mock_db)
         preset_value="Test", sort_order=0,
     )
 
-    _setup_db_for_task(mock_db, task, [form_def], {fd_id: [field]})
-
-    page = _make_mock_page()
-    browser = _make_mock_browser(_make_mock_context(page))
-    pw_patch, stealth_patch, screenshot_patch, _ = _build_executor_patches(page, browser)
+    db = _FakeDB(task, [form_def], {fd_id: [field]})
 
     vnc_mock = _make_two_phase_vnc_mock()
 
-    broadcaster_patch = patch(
-        "app.services.task_executor.Broadcaster.get_instance",
-        return_value=MagicMock(),
-    )
-
-    # Capture the execution object to inspect steps_log
-    added_objects = []
-    mock_db.add = MagicMock(side_effect=lambda obj: added_objects.append(obj))
-
-    with pw_patch, stealth_patch, screenshot_patch, broadcaster_patch:
-        from app.services.task_executor import TaskExecutor
-
-        executor = TaskExecutor(db=mock_db, vnc_manager=vnc_mock)
-        result = await executor.execute(str(task_id))
+    executor = TaskExecutor(db=db, vnc_manager=vnc_mock)
+    result = await executor.execute(task_id)
 
     assert result["status"] == "success"
 
     # Get the execution log object that was created
-    assert len(added_objects) == 1
-    execution = added_objects[0]
+    assert len(db.added) == 1
+    execution = db.added[0]
 
     # steps_log should have exactly 1 entry (one form step)
     assert len(execution.steps_log) == 1, (
@@ -944,16 +637,15 @@ async def test_no_duplicate_step_in_steps_log_after_manual_intervention(mock_db)
     assert execution.steps_log[0]["status"] == "submitted"
 
 
-@pytest.mark.asyncio
-async def test_vnc_cleanup_on_execution_exception(mock_db):
+async def test_vnc_cleanup_on_execution_exception(executor_env, fake_uuid):
     """VNC session is always cleaned up via finally, even when an unexpected
     exception occurs during execution (e.g., navigation fails).
 
     Regression test for: stop_session was only called in the success path,
     leaving Xvfb/x11vnc processes running on failure or exception.
     """
-    task_id = uuid.uuid4()
-    fd_id = uuid.uuid4()
+    task_id = fake_uuid()
+    fd_id = fake_uuid()
 
     task = make_task(id=task_id)
     form_def = make_form_definition(
@@ -963,77 +655,20 @@ async def test_vnc_cleanup_on_execution_exception(mock_db):
         human_breakpoint=True,
     )
 
-    _setup_db_for_task(mock_db, task, [form_def], {fd_id: []})
+    db = _FakeDB(task, [form_def], {fd_id: []})
 
     # Navigation throws an unexpected exception
-    page = _make_mock_page()
-    page.goto = AsyncMock(side_effect=Exception("DNS resolution failed"))
-    browser = _make_mock_browser(_make_mock_context(page))
-    pw_patch, stealth_patch, screenshot_patch, _ = _build_executor_patches(page, browser)
-
+    executor_env.page.goto = AsyncMock(side_effect=Exception("DNS resolution failed"))
     vnc_mock = _make_two_phase_vnc_mock()
 
-    broadcaster_patch = patch(
-        "app.services.task_executor.Broadcaster.get_instance",
-        return_value=MagicMock(),
-    )
-
-    with pw_patch, stealth_patch, screenshot_patch, broadcaster_patch:
-        from app.services.task_executor import TaskExecutor
-
-        executor = TaskExecutor(db=mock_db, vnc_manager=vnc_mock)
-        result = await executor.execute(str(task_id))
+    executor = TaskExecutor(db=db, vnc_manager=vnc_mock)
+    result = await executor.execute(task_id)
 
     assert result["status"] == "failed"
     assert "DNS resolution failed" in result["error"]
 
     # VNC display was reserved (needs_vnc=True due to human_breakpoint)
-    vnc_mock.reserve_display.assert_awaited_once()
+    assert len(vnc_mock.reserve_display.calls) == 1
 
     # VNC session is cleaned up by the finally block
-    vnc_mock.stop_session.assert_awaited_once()
-
-
-@pytest.mark.asyncio
-async def test_vnc_cleanup_on_timeout_failure(mock_db):
-    """VNC session is cleaned up when _vnc_pause times out.
-
-    Regression test for: early return from execute() after _vnc_pause
-    returned False would skip the stop_session call.
-    """
-    task_id = uuid.uuid4()
-    fd_id = uuid.uuid4()
-
-    task = make_task(id=task_id)
-    form_def = make_form_definition(
-        id=fd_id, task_id=task_id, step_order=1,
-        page_url="https://example.com/test",
-        form_selector="#form", submit_selector="#submit",
-        human_breakpoint=True,
-    )
-
-    _setup_db_for_task(mock_db, task, [form_def], {fd_id: []})
-
-    page = _make_mock_page()
-    browser = _make_mock_browser(_make_mock_context(page))
-    pw_patch, stealth_patch, screenshot_patch, _ = _build_executor_patches(page, browser)
-
-    # VNC times out
-    vnc_mock = _make_two_phase_vnc_mock()
-    vnc_mock.wait_for_resume = AsyncMock(return_value=False)
-
-    broadcaster_patch = patch(
-        "app.services.task_executor.Broadcaster.get_instance",
-        return_value=MagicMock(),
-    )
-
-    with pw_patch, stealth_patch, screenshot_patch, broadcaster_patch:
-        from app.services.task_executor import TaskExecutor
-
-        executor = TaskExecutor(db=mock_db, vnc_manager=vnc_mock)
-        result = await executor.execute(str(task_id))
-
-    assert result["status"] == "failed"
-
-    # VNC session is cleaned up by the finally block even on timeout
-    vnc_mock.stop_session.assert_awaited_once()
+    assert len(vnc_mock.stop_session.calls) == 1
@@ -22,6 +22,18 @@ SAMPLE_FIELDS = [
     },
 ]
 
+# Payloads the injected script hands to the exposed callbacks, serialized once.
+FIELD_SELECTED_DATA = {"index": 0, "selector": "#username", "name": "username", "type": "text"}
+FIELD_SELECTED_JSON = json.dumps(FIELD_SELECTED_DATA)
+FIELD_ADDED_DATA = {"selector": "#email", "tagName": "input", "type": "email", "name": "email"}
+FIELD_ADDED_JSON = json.dumps(FIELD_ADDED_DATA)
+FIELD_REMOVED_DATA = {"index": 1, "selector": "#password"}
+FIELD_REMOVED_JSON = json.dumps(FIELD_REMOVED_DATA)
+FIELD_VALUE_CHANGED_DATA = {"index": 0, "selector": "#username", "value": "testuser"}
+FIELD_VALUE_CHANGED_JSON = json.dumps(FIELD_VALUE_CHANGED_DATA)
+SELECTOR_FOUND = {"found": True, "matchCount": 1}
+SELECTOR_NOT_FOUND = {"found": False, "matchCount": 0}
+
 
 @pytest.fixture
 def mock_page():
@@ -40,20 +52,19 @@ def highlighter(mock_page):
     return FieldHighlighter(mock_page, task_id="test-analysis-123")
 
 
-@pytest.mark.asyncio
 async def test_setup_exposes_functions(highlighter, mock_page):
     """setup() should call expose_function for the 4 callbacks."""
     await highlighter.setup(SAMPLE_FIELDS)
 
     assert mock_page.expose_function.call_count == 4
-    exposed_names = [call.args[0] for call in mock_page.expose_function.call_args_list]
-    assert "__formbot_onFieldSelected" in exposed_names
-    assert "__formbot_onFieldAdded" in exposed_names
-    assert "__formbot_onFieldRemoved" in exposed_names
-    assert "__formbot_onFieldValueChanged" in exposed_names
+    assert {call.args[0] for call in mock_page.expose_function.call_args_list} == {
+        "__formbot_onFieldSelected",
+        "__formbot_onFieldAdded",
+        "__formbot_onFieldRemoved",
+        "__formbot_onFieldValueChanged",
+    }
 
 
-@pytest.mark.asyncio
 async def test_setup_only_exposes_once(highlighter, mock_page):
     """Calling setup() twice should not re-expose functions."""
     await highlighter.setup(SAMPLE_FIELDS)
@@ -62,17 +73,13 @@ async def test_setup_only_exposes_once(highlighter, mock_page):
     assert mock_page.expose_function.call_count == 4  # not 8
 
 
-@pytest.mark.asyncio
 async def test_setup_registers_navigation_listeners(highlighter, mock_page):
     """setup() should register load and framenavigated event listeners."""
     await highlighter.setup(SAMPLE_FIELDS)
 
-    events = [call.args[0] for call in mock_page.on.call_args_list]
-    assert "load" in events
-    assert "framenavigated" in events
+    assert {"load", "framenavigated"} <= {call.args[0] for call in mock_page.on.call_args_list}
 
 
-@pytest.mark.asyncio
 async def test_inject_evaluates_script_and_init(highlighter, mock_page):
     """inject() should evaluate the highlight.js script and call init()."""
     await highlighter.setup(SAMPLE_FIELDS)
@@ -84,12 +91,11 @@ async def test_inject_evaluates_script_and_init(highlighter, mock_page):
     # Check init was called with the fields JSON
     init_calls = [
         c for c in mock_page.evaluate.call_args_list
-        if "init(" in str(c)
+        if "init(" in c.args[0]
     ]
     assert len(init_calls) == 1
 
 
-@pytest.mark.asyncio
 async def test_cleanup_evaluates_cleanup_command(highlighter, mock_page):
     """cleanup() should evaluate the cleanup command."""
     await highlighter.cleanup()
@@ -99,7 +105,6 @@ async def test_cleanup_evaluates_cleanup_command(highlighter, mock_page):
     assert "command_cleanup" in call_arg
 
 
-@pytest.mark.asyncio
 async def test_update_fields(highlighter, mock_page):
     """update_fields() should update internal state and call evaluate."""
     new_fields = [{"field_selector": "#email", "field_name": "email", "field_type": "email"}]
@@ -110,7 +115,6 @@ async def test_update_fields(highlighter, mock_page):
     assert "command_updateFields" in call_arg
 
 
-@pytest.mark.asyncio
 async def test_set_mode(highlighter, mock_page):
     """set_mode() should evaluate setMode command."""
     await highlighter.set_mode("select")
@@ -121,7 +125,6 @@ async def test_set_mode(highlighter, mock_page):
     assert highlighter._mode == "select"
 
 
-@pytest.mark.asyncio
 async def test_inject_reapplies_saved_mode(highlighter, mock_page):
     """inject() should restore the current interaction mode after init()."""
     await highlighter.setup(SAMPLE_FIELDS)
@@ -131,14 +134,13 @@ async def test_inject_reapplies_saved_mode(highlighter, mock_page):
     await highlighter.inject()
 
     mode_calls = [
-        c for c in mock_page.evaluate.call_args_list
-        if "window.__FORMBOT_HIGHLIGHT.command_setMode(" in str(c)
+        c.args[0] for c in mock_page.evaluate.call_args_list
+        if "window.__FORMBOT_HIGHLIGHT.command_setMode(" in c.args[0]
     ]
     assert len(mode_calls) >= 1
-    assert any('"remove"' in str(call) for call in mode_calls)
+    assert any('"remove"' in script for script in mode_calls)
 
 
-@pytest.mark.asyncio
 async def test_focus_field(highlighter, mock_page):
     """focus_field() should evaluate focusField command with index."""
     await highlighter.focus_field(1)
@@ -148,79 +150,56 @@ async def test_focus_field(highlighter, mock_page):
     assert "1" in call_arg
 
 
-@pytest.mark.asyncio
-async def test_test_selector(highlighter, mock_page):
+@pytest.mark.parametrize(
+    "selector, evaluated, expected",
+    [
+        pytest.param("#username", SELECTOR_FOUND, SELECTOR_FOUND, id="found"),
+        pytest.param(".nonexistent", SELECTOR_NOT_FOUND, SELECTOR_NOT_FOUND, id="not_found"),
+        # A None from evaluate falls back to the not-found dict.
+        pytest.param(".broken", None, SELECTOR_NOT_FOUND, id="none_default"),
+    ],
+)
+async def test_test_selector(highlighter, mock_page, selector, evaluated, expected):
     """test_selector() should evaluate and return result."""
-    mock_page.evaluate = AsyncMock(return_value={"found": True, "matchCount": 1})
-
-    result = await highlighter.test_selector("#username")
-
-    assert result["found"] is True
-    assert result["matchCount"] == 1
-
-
-@pytest.mark.asyncio
-async def test_test_selector_not_found(highlighter, mock_page):
-    """test_selector() should handle not-found case."""
-    mock_page.evaluate = AsyncMock(return_value={"found": False, "matchCount": 0})
-
-    result = await highlighter.test_selector(".nonexistent")
+    mock_page.evaluate = AsyncMock(return_value=evaluated)
 
-    assert result["found"] is False
-    assert result["matchCount"] == 0
+    result = await highlighter.test_selector(selector)
 
+    assert result == expected
 
-@pytest.mark.asyncio
-async def test_test_selector_returns_default_on_none(highlighter, mock_page):
-    """test_selector() should return default dict if evaluate returns None."""
-    mock_page.evaluate = AsyncMock(return_value=None)
 
-    result = await highlighter.test_selector(".broken")
-
-    assert result == {"found": False, "matchCount": 0}
-
-
-@pytest.mark.asyncio
 async def test_on_field_selected_broadcasts(highlighter):
     """_on_field_selected should broadcast FieldSelected event."""
     with patch.object(highlighter.broadcaster, "trigger_task_editing") as mock_trigger:
-        data = {"index": 0, "selector": "#username", "name": "username", "type": "text"}
-        await highlighter._on_field_selected(json.dumps(data))
+        await highlighter._on_field_selected(FIELD_SELECTED_JSON)
 
-        mock_trigger.assert_called_once_with("test-analysis-123", "FieldSelected", data)
+        mock_trigger.assert_called_once_with("test-analysis-123", "FieldSelected", FIELD_SELECTED_DATA)
 
 
-@pytest.mark.asyncio
 async def test_on_field_added_broadcasts(highlighter):
     """_on_field_added should broadcast FieldAdded event."""
     with patch.object(highlighter.broadcaster, "trigger_task_editing") as mock_trigger:
-        data = {"selector": "#email", "tagName": "input", "type": "email", "name": "email"}
-        await highlighter._on_field_added(json.dumps(data))
+        await highlighter._on_field_added(FIELD_ADDED_JSON)
 
-        mock_trigger.assert_called_once_with("test-analysis-123", "FieldAdded", data)
+        mock_trigger.assert_called_once_with("test-analysis-123", "FieldAdded", FIELD_ADDED_DATA)
 
 
-@pytest.mark.asyncio
 async def test_on_field_removed_broadcasts(highlighter):
     """_on_field_removed should broadcast FieldRemoved event."""
     with patch.object(highlighter.broadcaster, "trigger_task_editing") as mock_trigger:
-        data = {"index": 1, "selector": "#password"}
-        await highlighter._on_field_removed(json.dumps(data))
+        await highlighter._on_field_removed(FIELD_REMOVED_JSON)
 
-        mock_trigger.assert_called_once_with("test-analysis-123", "FieldRemoved", data)
+        mock_trigger.assert_called_once_with("test-analysis-123", "FieldRemoved", FIELD_REMOVED_DATA)
 
 
-@pytest.mark.asyncio
 async def test_on_field_value_changed_broadcasts(highlighter):
     """_on_field_value_changed should broadcast FieldValueChanged event."""
     with patch.object(highlighter.broadcaster, "trigger_task_editing") as mock_trigger:
-        data = {"index": 0, "selector": "#username", "value": "testuser"}
-        await highlighter._on_field_value_changed(json.dumps(data))
+        await highlighter._on_field_value_changed(FIELD_VALUE_CHANGED_JSON)
 
-        mock_trigger.assert_called_once_with("test-analysis-123", "FieldValueChanged", data)
+        mock_trigger.assert_called_once_with("test-analysis-123", "FieldValueChanged", FIELD_VALUE_CHANGED_DATA)
 
 
-@pytest.mark.asyncio
 async def test_fill_field(highlighter, mock_page):
     """fill_field() should evaluate command_fillField with index and value."""
     await highlighter.fill_field(0, "hello")
@@ -231,24 +210,21 @@ async def test_fill_field(highlighter, mock_page):
     assert '"hello"' in call_arg
 
 
-@pytest.mark.asyncio
-async def test_read_field_value(highlighter, mock_page):
-    """read_field_value() should evaluate command_readFieldValue and return result."""
-    mock_page.evaluate = AsyncMock(return_value="current_val")
+@pytest.mark.parametrize(
+    "evaluated, expected",
+    [
+        pytest.param("current_val", "current_val", id="value"),
+        pytest.param(None, "", id="none_empty"),
+    ],
+)
+async def test_read_field_value(highlighter, mock_page, evaluated, expected):
+    """read_field_value() should evaluate command_readFieldValue and return the
+    result, or an empty string if evaluate returns None."""
+    mock_page.evaluate = AsyncMock(return_value=evaluated)
 
     result = await highlighter.read_field_value(1)
 
-    assert result == "current_val"
+    assert result == expected
     call_arg = mock_page.evaluate.call_args[0][0]
     assert "command_readFieldValue" in call_arg
     assert "1" in call_arg
-
-
-@pytest.mark.asyncio
-async def test_read_field_value_returns_empty_on_none(highlighter, mock_page):
-    """read_field_value() should return empty string if evaluate returns None."""
-    mock_page.evaluate = AsyncMock(return_value=None)
-
-    result = await highlighter.read_field_value(0)
-
-    assert result == ""